@@ -19,6 +19,14 @@ from jupyter_server.utils import url_path_join
 pytest_plugins = ("pytest_asyncio", "pytest_tornado")
 
 
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "mutates_contents: test rewrites existing files of the contents "
+        "fixture in place, so it needs real copies rather than hardlinks."
+    )
+
+
 def mkdir(tmp_path, *parts):
     path = tmp_path.joinpath(*parts)
     if not path.exists():
@@ -1,19 +1,21 @@
+import io
+import os
 import sys
-import json
+import time
+import asyncio
 import pathlib
+import tarfile
 import pytest
-from urllib.parse import ParseResult, urlunparse
+from functools import lru_cache
+from urllib.parse import ParseResult, urlunparse, quote
 
+import orjson
 import tornado
 
-from nbformat import writes, from_dict
-from nbformat.v4 import (
-    new_notebook, new_markdown_cell,
-)
-
-from jupyter_server.utils import url_path_join
+from nbformat import reads, writes, validate
+from nbformat.v4 import new_notebook
 
-from base64 import encodebytes, decodebytes
+from base64 import b64encode, b64decode
 
 from ...conftest import expected_http_error
 
@@ -21,6 +23,11 @@ from ...conftest import expected_http_error
 # Run all tests in this module using asyncio's event loop
 pytestmark = pytest.mark.asyncio
 
+# Request and response bodies are (de)serialized with orjson; tornado
+# accepts the bytes returned by orjson.dumps as a request body.
+_loads = orjson.loads
+_dumps = orjson.dumps
+
 
 def notebooks_only(dir_model):
     return [nb for nb in dir_model['content'] if nb['type']=='notebook']
@@ -44,33 +51,102 @@ dirs = [
     (u'å b', u'ç d'),
 ]
 
+# Short, stable test ids ('00', '01', ...) instead of the escaped unicode
+# names pytest would otherwise generate.
+DIRS_PARAM = [
+    pytest.param(d, name, id='{:02d}'.format(i))
+    for i, (d, name) in enumerate(dirs)
+]
+
+# File payloads are the same for every test, so compute them only once.
+# The empty notebook is written out by hand rather than built and
+# validated through nbformat; test_empty_notebook_constant guards it.
+_EMPTY_NB_JSON = (
+    b'{\n "cells": [],\n "metadata": {},\n'
+    b' "nbformat": 4,\n "nbformat_minor": 4\n}'
+)
+_BLOBS = {name: name.encode('utf-8') + b'\xFF' for _, name in dirs}
+_FILE_SPECS = [
+    (d, name, '{} text file'.format(name).encode('utf-8'), _BLOBS[name])
+    for d, name in dirs
+]
+
+# API paths of each fixture file, keyed by (path, name) from dirs.
+_PATHS = {
+    (d, name): {
+        ext: '{}/{}.{}'.format(d, name, ext).lstrip('/')
+        for ext in ('ipynb', 'txt', 'blob')
+    }
+    for d, name in dirs
+}
+
+
+def _build_contents_tar():
+    """Pack the contents tree into an in-memory tar archive."""
+    buf = io.BytesIO()
+    mtime = time.time()
+    with tarfile.open(fileobj=buf, mode='w', format=tarfile.PAX_FORMAT) as tar:
+        for d in sorted(set(d for d, _ in dirs if d)):
+            info = tarfile.TarInfo(d)
+            info.type = tarfile.DIRTYPE
+            info.mode = 0o755
+            info.mtime = mtime
+            tar.addfile(info)
+        for d, name, txt, blob in _FILE_SPECS:
+            paths = _PATHS[(d, name)]
+            for ext, data in (('ipynb', _EMPTY_NB_JSON), ('txt', txt), ('blob', blob)):
+                info = tarfile.TarInfo(paths[ext])
+                info.size = len(data)
+                info.mode = 0o644
+                info.mtime = mtime
+                tar.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+_TAR_BLOB = _build_contents_tar()
+
+# Use the 'data' extraction filter where this Python supports it.
+_EXTRACT_KWARGS = {'filter': 'data'} if hasattr(tarfile, 'data_filter') else {}
+
 
 @pytest.fixture
 def contents_dir(tmp_path, serverapp):
     return tmp_path / serverapp.root_dir
 
 
-@pytest.fixture
-def contents(contents_dir):
-    # Create files in temporary directory
-    for d, name in dirs:
-        p = contents_dir / d
-        p.mkdir(parents=True, exist_ok=True)
+def _extract_contents(dst):
+    with tarfile.open(fileobj=io.BytesIO(_TAR_BLOB)) as tar:
+        tar.extractall(str(dst), **_EXTRACT_KWARGS)
+
 
-        # Create a notebook
-        nb = writes(new_notebook(), version=4)
-        nbname = p.joinpath('{}.ipynb'.format(name))
-        nbname.write_text(nb)
+def _clone_tree(src, dst):
+    """Recreate the directories of ``src`` under ``dst`` and hardlink its files."""
+    for entry in os.scandir(src):
+        target = os.path.join(dst, entry.name)
+        if entry.is_dir():
+            os.mkdir(target)
+            _clone_tree(entry.path, target)
+        else:
+            os.link(entry.path, target)
 
-        # Create a text file
-        txt = '{} text file'.format(name)
-        txtname = p.joinpath('{}.txt'.format(name))
-        txtname.write_text(txt)
 
-        # Create a random blob
-        blob = name.encode('utf-8') + b'\xFF'
-        blobname = p.joinpath('{}.blob'.format(name))
-        blobname.write_bytes(blob)
+@pytest.fixture(scope='session')
+def _contents_template(tmp_path_factory):
+    template = tmp_path_factory.mktemp('contents_template')
+    _extract_contents(template)
+    return template
+
+
+@pytest.fixture
+def contents(request, contents_dir, _contents_template):
+    # Hardlinked files share their data with the session template, so a
+    # test that rewrites an existing file in place (saving it, restoring a
+    # checkpoint over it) must be marked to get real copies instead.
+    # Creating, renaming and deleting files is safe on hardlinks.
+    if request.node.get_closest_marker('mutates_contents'):
+        _extract_contents(contents_dir)
+    else:
+        _clone_tree(str(_contents_template), str(contents_dir))
 
 
 @pytest.fixture
@@ -78,20 +154,29 @@ def folders():
     return list(set(item[0] for item in dirs))
 
 
-@pytest.mark.parametrize('path,name', dirs)
+async def test_empty_notebook_constant():
+    # Catch drift from what nbformat itself would write for this notebook.
+    expected = new_notebook(nbformat_minor=4)
+    assert writes(expected, version=4).encode('utf-8') == _EMPTY_NB_JSON
+    nb = reads(_EMPTY_NB_JSON.decode('utf-8'), as_version=4)
+    validate(nb)
+    assert nb == expected
+
+
+@pytest.mark.parametrize('path,name', DIRS_PARAM)
 async def test_list_notebooks(fetch, contents, path, name):
     response = await fetch(
         'api', 'contents', path,
         method='GET',
     )
-    data = json.loads(response.body)
+    data = _loads(response.body)
     nbs = notebooks_only(data)
     assert len(nbs) > 0
     assert name+'.ipynb' in [n['name'] for n in nbs]
-    assert url_path_join(path, name+'.ipynb') in [n['path'] for n in nbs]
+    assert _PATHS[(path, name)]['ipynb'] in [n['path'] for n in nbs]
 
 
-@pytest.mark.parametrize('path,name', dirs)
+@pytest.mark.parametrize('path,name', DIRS_PARAM)
 async def test_get_dir_no_contents(fetch, contents, path, name):
     response = await fetch(
         'api', 'contents', path,
@@ -100,31 +185,23 @@ async def test_get_dir_no_contents(fetch, contents, path, name):
             content='0',
         )
     )
-    model = json.loads(response.body)
+    model = _loads(response.body)
     assert model['path'] == path
     assert model['type'] == 'directory'
     assert 'content' in model
     assert model['content'] == None
 
 
-async def test_list_nonexistant_dir(fetch, contents):
-    with pytest.raises(tornado.httpclient.HTTPClientError):
-        await fetch(
-            'api', 'contents', 'nonexistant',
-            method='GET',
-        )
-
-
-@pytest.mark.parametrize('path,name', dirs)
+@pytest.mark.parametrize('path,name', DIRS_PARAM)
 async def test_get_nb_contents(fetch, contents, path, name):
     nbname = name+'.ipynb'
-    nbpath = (path + '/' + nbname).lstrip('/')
+    nbpath = _PATHS[(path, name)]['ipynb']
     r = await fetch(
         'api', 'contents', nbpath,
         method='GET',
         params=dict(content='1') 
     )
-    model = json.loads(r.body)
+    model = _loads(r.body)
     assert model['name'] == nbname
     assert model['path'] == nbpath
     assert model['type'] == 'notebook'
@@ -134,16 +211,16 @@ async def test_get_nb_contents(fetch, contents, path, name):
     assert isinstance(model['content']['metadata'], dict)
 
 
-@pytest.mark.parametrize('path,name', dirs)
+@pytest.mark.parametrize('path,name', DIRS_PARAM)
 async def test_get_nb_no_contents(fetch, contents, path, name):
     nbname = name+'.ipynb'
-    nbpath = (path + '/' + nbname).lstrip('/')
+    nbpath = _PATHS[(path, name)]['ipynb']
     r = await fetch(
         'api', 'contents', nbpath,
         method='GET',
         params=dict(content='0') 
     )
-    model = json.loads(r.body)
+    model = _loads(r.body)
     assert model['name'] == nbname
     assert model['path'] == nbpath
     assert model['type'] == 'notebook'
@@ -161,12 +238,12 @@ async def test_get_nb_invalid(contents_dir, fetch, contents):
         }],
     }
     nbpath = u'å b/Validate tést.ipynb'
-    (contents_dir / nbpath).write_text(json.dumps(nb))
+    (contents_dir / nbpath).write_bytes(_dumps(nb))
     r = await fetch(
         'api', 'contents', nbpath,
         method='GET',
     )
-    model = json.loads(r.body)
+    model = _loads(r.body)
     assert model['path'] == nbpath
     assert model['type'] == 'notebook'
     assert 'content' in model
@@ -174,25 +251,33 @@ async def test_get_nb_invalid(contents_dir, fetch, contents):
     assert 'validation failed' in model['message'].lower()
 
 
-async def test_get_contents_no_such_file(fetch):
+@pytest.mark.parametrize('path,params,expected_code', [
+    pytest.param('nonexistant', {}, 404, id='no-such-dir'),
+    pytest.param('foo/q.ipynb', {}, 404, id='no-such-notebook'),
+    pytest.param('foo/q.txt', {}, 404, id='no-such-file'),
+    # Binary content can't be read as text
+    pytest.param('foo/bar/baz.blob', dict(type='file', format='text'), 400, id='blob-as-text'),
+])
+async def test_fetch_error(fetch, contents, path, params, expected_code):
     with pytest.raises(tornado.httpclient.HTTPClientError) as e:
         await fetch(
-            'api', 'contents', 'foo/q.ipynb',
+            'api', 'contents', path,
             method='GET',
+            params=params
         )
-    assert e.value.code == 404
+    assert expected_http_error(e, expected_code)
 
 
-@pytest.mark.parametrize('path,name', dirs)
+@pytest.mark.parametrize('path,name', DIRS_PARAM)
 async def test_get_text_file_contents(fetch, contents, path, name):
     txtname = name+'.txt'
-    txtpath = (path + '/' + txtname).lstrip('/')
+    txtpath = _PATHS[(path, name)]['txt']
     r = await fetch(
         'api', 'contents', txtpath,
         method='GET',
         params=dict(content='1') 
     )
-    model = json.loads(r.body)
+    model = _loads(r.body)
     assert model['name'] == txtname
     assert model['path'] == txtpath
     assert 'content' in model
@@ -200,52 +285,26 @@ async def test_get_text_file_contents(fetch, contents, path, name):
     assert model['type'] == 'file'
     assert model['content'] == '{} text file'.format(name)
 
-    with pytest.raises(tornado.httpclient.HTTPClientError) as e:
-        await fetch(
-            'api', 'contents', 'foo/q.txt',
-            method='GET',
-        )
-    assert expected_http_error(e, 404)
-
-    with pytest.raises(tornado.httpclient.HTTPClientError) as e:
-        await fetch(
-            'api', 'contents', 'foo/bar/baz.blob',
-            method='GET',
-            params=dict(
-                type='file',
-                format='text'
-            )
-        )
-    assert expected_http_error(e, 400)
-
-
 
-@pytest.mark.parametrize('path,name', dirs)
+@pytest.mark.parametrize('path,name', DIRS_PARAM)
 async def test_get_binary_file_contents(fetch, contents, path, name):
     blobname = name+'.blob'
-    blobpath = (path + '/' + blobname).lstrip('/')
+    blobpath = _PATHS[(path, name)]['blob']
     r = await fetch(
         'api', 'contents', blobpath,
         method='GET',
         params=dict(content='1') 
     )
-    model = json.loads(r.body)
+    model = _loads(r.body)
     assert model['name'] == blobname
     assert model['path'] == blobpath
     assert 'content' in model
     assert model['format'] == 'base64'
     assert model['type'] == 'file'
-    data_out = decodebytes(model['content'].encode('ascii'))
-    data_in = name.encode('utf-8') + b'\xFF'
+    data_out = b64decode(model['content'])
+    data_in = _BLOBS[name]
     assert data_in == data_out
 
-    with pytest.raises(tornado.httpclient.HTTPClientError) as e:
-        await fetch(
-            'api', 'contents', 'foo/q.txt',
-            method='GET',
-        )
-    assert expected_http_error(e, 404)
-
 
 async def test_get_bad_type(fetch, contents):
     with pytest.raises(tornado.httpclient.HTTPClientError) as e:
@@ -269,12 +328,17 @@ async def test_get_bad_type(fetch, contents):
     assert expected_http_error(e, 400, '%s is not a directory' % path)
 
 
-def _check_created(r, contents_dir, path, name, type='notebook'):
+@lru_cache(maxsize=512)
+def _location(fpath):
+    # Same escaping as tornado's url_escape(fpath, plus=False).
+    return '/api/contents/' + quote(fpath)
+
+
+def _check_created(r, model, contents_dir, path, name, type='notebook'):
+    """Check a 201 response; ``model`` is the caller's parsed ``r.body``."""
     fpath = path+'/'+name
     assert r.code == 201
-    location = '/api/contents/' + tornado.escape.url_escape(fpath, plus=False)
-    assert r.headers['Location'] == location
-    model = json.loads(r.body)
+    assert r.headers['Location'] == _location(fpath)
     assert model['name'] == name
     assert model['path'] == fpath
     assert model['type'] == type
@@ -291,26 +355,29 @@ async def test_create_untitled(fetch, contents, contents_dir):
     r = await fetch(
         'api', 'contents', path, 
         method='POST',
-        body=json.dumps({'ext': '.ipynb'})
+        body=_dumps({'ext': '.ipynb'})
     )
-    _check_created(r, contents_dir, path, name, type='notebook')
+    model = _loads(r.body)
+    _check_created(r, model, contents_dir, path, name, type='notebook')
 
     name = 'Untitled1.ipynb'
     r = await fetch(
         'api', 'contents', path, 
         method='POST',
-        body=json.dumps({'ext': '.ipynb'})
+        body=_dumps({'ext': '.ipynb'})
     )
-    _check_created(r, contents_dir, path, name, type='notebook')
+    model = _loads(r.body)
+    _check_created(r, model, contents_dir, path, name, type='notebook')
 
     path = 'foo/bar'
     name = 'Untitled.ipynb'
     r = await fetch(
         'api', 'contents', path, 
         method='POST',
-        body=json.dumps({'ext': '.ipynb'})
+        body=_dumps({'ext': '.ipynb'})
     )
-    _check_created(r, contents_dir, path, name, type='notebook')
+    model = _loads(r.body)
+    _check_created(r, model, contents_dir, path, name, type='notebook')
 
 
 async def test_create_untitled_txt(fetch, contents, contents_dir):
@@ -319,20 +386,32 @@ async def test_create_untitled_txt(fetch, contents, contents_dir):
     r = await fetch(
         'api', 'contents', path, 
         method='POST',
-        body=json.dumps({'ext': '.txt'})
+        body=_dumps({'ext': '.txt'})
     )
-    _check_created(r, contents_dir, path, name, type='file')
+    model = _loads(r.body)
+    _check_created(r, model, contents_dir, path, name, type='file')
 
     r = await fetch(
         'api', 'contents', path, name,
         method='GET'
     )
-    model = json.loads(r.body)
+    model = _loads(r.body)
     assert model['type'] == 'file'
     assert model['format'] == 'text'
     assert model['content'] == ''
 
 
+def _body_producer(data, chunk_size=64 * 1024):
+    """Return a tornado ``body_producer`` that sends ``data`` in chunks.
+
+    No Content-Length is set, so the client uses chunked transfer encoding.
+    """
+    async def producer(write):
+        for i in range(0, len(data), chunk_size):
+            await write(data[i:i + chunk_size])
+    return producer
+
+
 async def test_upload(fetch, contents, contents_dir):
     nb = new_notebook()
     nbmodel = {'content': nb, 'type': 'notebook'}
@@ -341,9 +420,10 @@ async def test_upload(fetch, contents, contents_dir):
     r = await fetch(
         'api', 'contents', path, name,
         method='PUT',
-        body=json.dumps(nbmodel)
+        body_producer=_body_producer(_dumps(nbmodel))
     )
-    _check_created(r, contents_dir, path, name)
+    model = _loads(r.body)
+    _check_created(r, model, contents_dir, path, name)
 
 
 async def test_mkdir_untitled(fetch, contents, contents_dir):
@@ -352,26 +432,29 @@ async def test_mkdir_untitled(fetch, contents, contents_dir):
     r = await fetch(
         'api', 'contents', path,
         method='POST',
-        body=json.dumps({'type': 'directory'})
+        body=_dumps({'type': 'directory'})
     )
-    _check_created(r, contents_dir, path, name, type='directory')
+    model = _loads(r.body)
+    _check_created(r, model, contents_dir, path, name, type='directory')
 
     name = 'Untitled Folder 1'
     r = await fetch(
         'api', 'contents', path,
         method='POST',
-        body=json.dumps({'type': 'directory'})
+        body=_dumps({'type': 'directory'})
     )
-    _check_created(r, contents_dir, path, name, type='directory')
+    model = _loads(r.body)
+    _check_created(r, model, contents_dir, path, name, type='directory')
 
     name = 'Untitled Folder'
     path = 'foo/bar'
     r = await fetch(
         'api', 'contents', path,
         method='POST',
-        body=json.dumps({'type': 'directory'})
+        body=_dumps({'type': 'directory'})
     )
-    _check_created(r, contents_dir, path, name, type='directory')
+    model = _loads(r.body)
+    _check_created(r, model, contents_dir, path, name, type='directory')
 
 
 async def test_mkdir(fetch, contents, contents_dir):
@@ -380,9 +463,10 @@ async def test_mkdir(fetch, contents, contents_dir):
     r = await fetch(
         'api', 'contents', path, name,
         method='PUT',
-        body=json.dumps({'type': 'directory'})
+        body=_dumps({'type': 'directory'})
     )
-    _check_created(r, contents_dir, path, name, type='directory')
+    model = _loads(r.body)
+    _check_created(r, model, contents_dir, path, name, type='directory')
 
 
 async def test_mkdir_hidden_400(fetch):
@@ -390,7 +474,7 @@ async def test_mkdir_hidden_400(fetch):
         await fetch(
             'api', 'contents', 'å b/.hidden',
             method='PUT',
-            body=json.dumps({'type': 'directory'})
+            body=_dumps({'type': 'directory'})
         )
     assert expected_http_error(e, 400)
 
@@ -407,7 +491,7 @@ async def test_upload_txt(fetch, contents, contents_dir):
     await fetch(
         'api', 'contents', path, name,
         method='PUT',
-        body=json.dumps(model)
+        body_producer=_body_producer(_dumps(model))
     )
 
     # check roundtrip
@@ -415,7 +499,7 @@ async def test_upload_txt(fetch, contents, contents_dir):
         'api', 'contents', path, name,
         method='GET'
     )
-    model = json.loads(r.body)
+    model = _loads(r.body)
     assert model['type'] == 'file'
     assert model['format'] == 'text'
     assert model['path'] == path+'/'+name
@@ -424,7 +508,7 @@ async def test_upload_txt(fetch, contents, contents_dir):
 
 async def test_upload_b64(fetch, contents, contents_dir):
     body = b'\xFFblob'
-    b64body = encodebytes(body).decode('ascii')
+    b64body = b64encode(body).decode('ascii')
     model = {
         'content' : b64body,
         'format'  : 'base64',
@@ -435,18 +519,18 @@ async def test_upload_b64(fetch, contents, contents_dir):
     await fetch(
         'api', 'contents', path, name,
         method='PUT',
-        body=json.dumps(model)
+        body_producer=_body_producer(_dumps(model))
     )
     # check roundtrip
     r = await fetch(
         'api', 'contents', path, name,
         method='GET'
     )
-    model = json.loads(r.body)
+    model = _loads(r.body)
     assert model['type'] == 'file'
     assert model['path'] == path+'/'+name
     assert model['format'] == 'base64'
-    decoded = decodebytes(model['content'].encode('ascii'))
+    decoded = b64decode(model['content'])
     assert decoded == body
 
 
@@ -457,27 +541,30 @@ async def test_copy(fetch, contents, contents_dir):
     r = await fetch(
         'api', 'contents', path,
         method='POST',
-        body=json.dumps({'copy_from': path+'/'+name})
+        body=_dumps({'copy_from': path+'/'+name})
     )
-    _check_created(r, contents_dir, path, copy, type='notebook')
+    model = _loads(r.body)
+    _check_created(r, model, contents_dir, path, copy, type='notebook')
     
     # Copy the same file name
     copy2 = 'ç d-Copy2.ipynb'
     r = await fetch(
         'api', 'contents', path,
         method='POST',
-        body=json.dumps({'copy_from': path+'/'+name})
+        body=_dumps({'copy_from': path+'/'+name})
     )
-    _check_created(r, contents_dir, path, copy2, type='notebook')
+    model = _loads(r.body)
+    _check_created(r, model, contents_dir, path, copy2, type='notebook')
 
     # copy a copy.
     copy3 = 'ç d-Copy3.ipynb'
     r = await fetch(
         'api', 'contents', path,
         method='POST',
-        body=json.dumps({'copy_from': path+'/'+copy2})
+        body=_dumps({'copy_from': path+'/'+copy2})
     )
-    _check_created(r, contents_dir, path, copy3, type='notebook')
+    model = _loads(r.body)
+    _check_created(r, model, contents_dir, path, copy3, type='notebook')
 
 
 async def test_copy_path(fetch, contents, contents_dir):
@@ -488,16 +575,18 @@ async def test_copy_path(fetch, contents, contents_dir):
     r = await fetch(
         'api', 'contents', path2,
         method='POST',
-        body=json.dumps({'copy_from': path1+'/'+name})
+        body=_dumps({'copy_from': path1+'/'+name})
     )
-    _check_created(r, contents_dir, path2, name, type='notebook')
+    model = _loads(r.body)
+    _check_created(r, model, contents_dir, path2, name, type='notebook')
 
     r = await fetch(
         'api', 'contents', path2,
         method='POST',
-        body=json.dumps({'copy_from': path1+'/'+name})
+        body=_dumps({'copy_from': path1+'/'+name})
     )
-    _check_created(r, contents_dir, path2, copy, type='notebook')
+    model = _loads(r.body)
+    _check_created(r, model, contents_dir, path2, copy, type='notebook')
 
 
 async def test_copy_put_400(fetch, contents, contents_dir):
@@ -505,7 +594,7 @@ async def test_copy_put_400(fetch, contents, contents_dir):
         await fetch(
             'api', 'contents', 'å b/cøpy.ipynb',
             method='PUT',
-            body=json.dumps({'copy_from': 'å b/ç d.ipynb'})
+            body=_dumps({'copy_from': 'å b/ç d.ipynb'})
         )
     assert expected_http_error(e, 400)
 
@@ -515,15 +604,15 @@ async def test_copy_dir_400(fetch, contents, contents_dir):
         await fetch(
             'api', 'contents', 'foo',
             method='POST',
-            body=json.dumps({'copy_from': 'å b'})
+            body=_dumps({'copy_from': 'å b'})
         )
     assert expected_http_error(e, 400)
 
 
-@pytest.mark.parametrize('path,name', dirs)
+@pytest.mark.parametrize('path,name', DIRS_PARAM)
 async def test_delete(fetch, contents, contents_dir, path, name):
     nbname = name+'.ipynb'
-    nbpath = (path + '/' + nbname).lstrip('/')
+    nbpath = _PATHS[(path, name)]['ipynb']
     r = await fetch(
         'api', 'contents', nbpath,
         method='DELETE',
@@ -539,19 +628,21 @@ async def test_delete_dirs(fetch, contents, folders):
             method='GET'
         )
         # Get JSON blobs for each content.
-        listing = json.loads(r.body)['content']
-        # Delete all content
-        for model in listing:
-            await fetch(
+        listing = _loads(r.body)['content']
+        # Delete all content concurrently
+        await asyncio.gather(*(
+            fetch(
                 'api', 'contents', model['path'],
                 method='DELETE'
             )
+            for model in listing
+        ))
     # Make sure all content has been deleted.
     r = await fetch(
         'api', 'contents',
         method='GET'
     )
-    model = json.loads(r.body)
+    model = _loads(r.body)
     assert model['content'] == []
 
 
@@ -579,13 +670,13 @@ async def test_rename(fetch, contents, contents_dir):
     r = await fetch(
         'api', 'contents', path, name,
         method='PATCH',
-        body=json.dumps({'path': path+'/'+new_name})
+        body=_dumps({'path': path+'/'+new_name})
     )
     fpath = path+'/'+new_name
     assert r.code == 200
     location = '/api/contents/' + fpath
     assert r.headers['Location'] == location
-    model = json.loads(r.body)
+    model = _loads(r.body)
     assert model['name'] == new_name
     assert model['path'] == fpath
     fpath = contents_dir / fpath
@@ -596,61 +687,12 @@ async def test_rename(fetch, contents, contents_dir):
         'api', 'contents', path,
         method='GET'
     )
-    listing = json.loads(r.body)
+    listing = _loads(r.body)
     nbnames = [name['name'] for name in listing['content']]
     assert 'z.ipynb' in nbnames
     assert 'a.ipynb' not in nbnames
 
 
-async def test_checkpoints_follow_file(fetch, contents):
-    path = 'foo'
-    name = 'a.ipynb'
-    
-    # Read initial file.
-    r = await fetch(
-        'api', 'contents', path, name,
-        method='GET'
-    )
-    model = json.loads(r.body)
-    
-    # Create a checkpoint of initial state
-    r = await fetch(
-        'api', 'contents', path, name, 'checkpoints',
-        method='POST',
-        allow_nonstandard_methods=True
-    )
-    cp1 = json.loads(r.body)
-    
-    # Modify file and save.
-    nbcontent = model['content']
-    nb = from_dict(nbcontent)
-    hcell = new_markdown_cell('Created by test')
-    nb.cells.append(hcell)
-    nbmodel = {'content': nb, 'type': 'notebook'}
-    r = await fetch(
-        'api', 'contents', path, name,
-        method='PUT',
-        body=json.dumps(nbmodel)
-    )
-
-    # List checkpoints
-    r = await fetch(
-        'api', 'contents', path, name, 'checkpoints',
-        method='GET',
-    )
-    cps = json.loads(r.body)
-    assert cps == [cp1]
-
-    r = await fetch(
-        'api', 'contents', path, name,
-        method='GET'
-    )
-    model = json.loads(r.body)
-    nbcontent = model['content']
-    nb = from_dict(nbcontent)
-    assert nb.cells[0].source == "Created by test"
-
-
 async def test_rename_existing(fetch, contents):
     with pytest.raises(tornado.httpclient.HTTPClientError) as e:
         path = 'foo'
@@ -660,160 +702,103 @@ async def test_rename_existing(fetch, contents):
         r = await fetch(
             'api', 'contents', path, name,
             method='PATCH',
-            body=json.dumps({'path': path+'/'+new_name})
+            body=_dumps({'path': path+'/'+new_name})
         )
     assert expected_http_error(e, 409)
 
 
+def _markdown_cell(source):
+    # A plain nbformat 4.4 cell; the fixture notebooks don't require cell ids.
+    return {'cell_type': 'markdown', 'metadata': {}, 'source': source}
+
+
+@pytest.mark.mutates_contents
 async def test_save(fetch, contents):
     r = await fetch(
         'api', 'contents', 'foo/a.ipynb',
         method='GET'
     )
-    model = json.loads(r.body)
-    nbmodel = model['content']
-    nb = from_dict(nbmodel)
-    nb.cells.append(new_markdown_cell('Created by test ³'))
-    nbmodel = {'content': nb, 'type': 'notebook'}
+    model = _loads(r.body)
+    nbcontent = model['content']
+    nbcontent['cells'].append(_markdown_cell('Created by test ³'))
+    nbmodel = {'content': nbcontent, 'type': 'notebook'}
     r = await fetch(
         'api', 'contents', 'foo/a.ipynb',
         method='PUT',
-        body=json.dumps(nbmodel)
+        body=_dumps(nbmodel)
     )
     # Round trip.
     r = await fetch(
         'api', 'contents', 'foo/a.ipynb',
         method='GET'
     )
-    model = json.loads(r.body)
-    newnb = from_dict(model['content'])
-    assert newnb.cells[0].source == 'Created by test ³'
+    model = _loads(r.body)
+    assert model['content']['cells'][0]['source'] == 'Created by test ³'
 
 
-async def test_checkpoints(fetch, contents):
-    path = 'foo/a.ipynb'
-    resp = await fetch(
-        'api', 'contents', path,
-        method='GET' 
-    )
-    model = json.loads(resp.body)
-    r = await fetch(
-        'api', 'contents', path, 'checkpoints',
-        method='POST',
-        allow_nonstandard_methods=True
-    )
-    assert r.code == 201
-    cp1 = json.loads(r.body)
-    assert set(cp1) == {'id', 'last_modified'}
-    assert r.headers['Location'].split('/')[-1] == cp1['id']
+def _modify_notebook(content):
+    # Leave the caller's content untouched; it is compared after restoring.
+    cells = content['cells'] + [_markdown_cell('Created by test')]
+    return {'content': dict(content, cells=cells), 'type': 'notebook'}
 
-    # Modify it.
-    nbcontent = model['content']
-    nb = from_dict(nbcontent)
-    hcell = new_markdown_cell('Created by test')
-    nb.cells.append(hcell)
-    
-    # Save it.
-    nbmodel = {'content': nb, 'type': 'notebook'}
-    resp = await fetch(
-        'api', 'contents', path,
-        method='PUT',
-        body=json.dumps(nbmodel)
-    )
-    
-    # List checkpoints
-    r = await fetch(
-        'api', 'contents', path, 'checkpoints',
-        method='GET'
-    )
-    cps = json.loads(r.body)
-    assert cps == [cp1]
 
-    r = await fetch(
-        'api', 'contents', path,
-        method='GET' 
-    )
-    nbcontent = json.loads(r.body)['content']
-    nb = from_dict(nbcontent)
-    assert nb.cells[0].source == 'Created by test'
+def _modify_file(content):
+    return {
+        'content': content + '\nsecond line',
+        'type': 'file',
+        'format': 'text',
+    }
 
-    # Restore Checkpoint cp1
-    r = await fetch(
-        'api', 'contents', path, 'checkpoints', cp1['id'],
-        method='POST',
-        allow_nonstandard_methods=True
-    )
-    assert r.code == 204
 
-    r = await fetch(
-        'api', 'contents', path,
-        method='GET'
-    )
-    nbcontent = json.loads(r.body)['content']
-    nb = from_dict(nbcontent)
-    assert nb.cells == []
+def _last_cell_source(content):
+    return content['cells'][-1]['source']
 
-    # Delete cp1
-    r = await fetch(
-        'api', 'contents', path, 'checkpoints', cp1['id'],
-        method='DELETE'
-    )
-    assert r.code == 204
 
+@pytest.mark.mutates_contents
+@pytest.mark.parametrize('path,modify,saved', [
+    pytest.param('foo/a.ipynb', _modify_notebook, _last_cell_source, id='notebook'),
+    pytest.param('foo/a.txt', _modify_file, lambda content: content, id='file'),
+])
+async def test_checkpoints(fetch, contents, path, modify, saved):
     r = await fetch(
-        'api', 'contents', path, 'checkpoints',
+        'api', 'contents', path,
         method='GET'
     )
-    cps = json.loads(r.body)
-    assert cps == []
-
+    orig_content = _loads(r.body)['content']
 
-async def test_file_checkpoints(fetch, contents):
-    path = 'foo/a.txt'
-    resp = await fetch(
-        'api', 'contents', path,
-        method='GET' 
-    )
-    orig_content = json.loads(resp.body)['content']
+    # Create a checkpoint of initial state
     r = await fetch(
         'api', 'contents', path, 'checkpoints',
         method='POST',
         allow_nonstandard_methods=True
     )
     assert r.code == 201
-    cp1 = json.loads(r.body)
+    cp1 = _loads(r.body)
     assert set(cp1) == {'id', 'last_modified'}
     assert r.headers['Location'].split('/')[-1] == cp1['id']
 
-    # Modify it.
-    new_content = orig_content + '\nsecond line'
-    model = {
-        'content': new_content,
-        'type': 'file',
-        'format': 'text',
-    }
-    
-    # Save it.
-    resp = await fetch(
+    # Modify it and save.
+    model = modify(orig_content)
+    await fetch(
         'api', 'contents', path,
         method='PUT',
-        body=json.dumps(model)
+        body=_dumps(model)
     )
-    
-    # List checkpoints
+
+    # List checkpoints; saving must not create or drop any.
     r = await fetch(
         'api', 'contents', path, 'checkpoints',
         method='GET'
     )
-    cps = json.loads(r.body)
+    cps = _loads(r.body)
     assert cps == [cp1]
 
     r = await fetch(
         'api', 'contents', path,
-        method='GET' 
+        method='GET'
     )
-    content = json.loads(r.body)['content']
-    assert content == new_content
+    content = _loads(r.body)['content']
+    assert saved(content) == saved(model['content'])
 
     # Restore Checkpoint cp1
     r = await fetch(
@@ -827,7 +812,7 @@ async def test_file_checkpoints(fetch, contents):
         'api', 'contents', path,
         method='GET'
     )
-    restored_content = json.loads(r.body)['content']
+    restored_content = _loads(r.body)['content']
     assert restored_content == orig_content
 
     # Delete cp1
@@ -841,5 +826,5 @@ async def test_file_checkpoints(fetch, contents):
         'api', 'contents', path, 'checkpoints',
         method='GET'
     )
-    cps = json.loads(r.body)
-    assert cps == []
\ No newline at end of file
+    cps = _loads(r.body)
+    assert cps == []